@@ -1,5 +1,4 @@
 import pathlib
-from collections import defaultdict
 from os import PathLike
 from typing import Any
 
@@ -96,16 +95,18 @@ class GlyphsBackend:
 
         self.gsFont = gsFont
 
-        # Fill the glyphs list with dummy placeholder glyphs
-        self.gsFont.glyphs = [
-            glyphsLib.classes.GSGlyph() for i in range(len(rawGlyphsData))
-        ]
+        # Fill the glyphs list with a dummy placeholder glyph, which gets
+        # replaced by the real glyph in _ensureGlyphIsParsed. Sharing one
+        # object is fine: glyphsLib's glyphs setter only assigns its parent,
+        # and each slot is swapped out via __setitem__ before it is used
+        placeholderGlyph = glyphsLib.classes.GSGlyph()
+        self.gsFont.glyphs = [placeholderGlyph] * len(rawGlyphsData)
         self.rawGlyphsData = rawGlyphsData
 
         self.glyphNameToIndex = {
             glyphData["glyphname"]: i for i, glyphData in enumerate(rawGlyphsData)
         }
-        self.parsedGlyphNames: set[str] = set()
+        self.parsedGlyphs: dict[str, glyphsLib.classes.GSGlyph] = {}
 
         dsAxes = [
             dsAxis
@@ -115,23 +116,31 @@ class GlyphsBackend:
         ]
 
         self.axisNames = {axis.name for axis in dsAxes}
+        self.localAxisNameMapping = makeLocalAxisNameMapping(self.axisNames)
+
+        axisDefs = [
+            axisDef
+            for axisDef in get_axis_definitions(self.gsFont)
+            if axisDef.name in self.axisNames
+        ]
 
         self.locationByMasterID = {}
+        self.masterNameByID = {}
         for master in self.gsFont.masters:
-            location = {}
-            for axisDef in get_axis_definitions(self.gsFont):
-                if axisDef.name in self.axisNames:
-                    location[axisDef.name] = axisDef.get_design_loc(master)
-            self.locationByMasterID[master.id] = location
+            self.locationByMasterID[master.id] = {
+                axisDef.name: axisDef.get_design_loc(master) for axisDef in axisDefs
+            }
+            self.masterNameByID[master.id] = master.name
+
+        self.defaultMasterID = get_regular_master(self.gsFont).id
 
         self.glyphMap, self.kerningGroups = _readGlyphMapAndKerningGroups(
             rawGlyphsData,
             self.gsFont.format_version,
         )
 
-        axes: list[FontAxis | DiscreteFontAxis] = []
-        for dsAxis in dsAxes:
-            axis = FontAxis(
+        self.axes: list[FontAxis | DiscreteFontAxis] = [
+            FontAxis(
                 minValue=dsAxis.minimum,
                 defaultValue=dsAxis.default,
                 maxValue=dsAxis.maximum,
@@ -139,11 +148,10 @@ class GlyphsBackend:
                 name=dsAxis.name,
                 tag=dsAxis.tag,
                 hidden=dsAxis.hidden,
+                mapping=[[a, b] for a, b in dsAxis.map],
             )
-            if dsAxis.map:
-                axis.mapping = [[a, b] for a, b in dsAxis.map]
-            axes.append(axis)
-        self.axes = axes
+            for dsAxis in dsAxes
+        ]
 
     @staticmethod
     def _loadFiles(path: PathLike) -> tuple[dict[str, Any], list[Any]]:
@@ -184,13 +192,23 @@ class GlyphsBackend:
     async def getKerning(self) -> dict[str, Kerning]:
         # TODO: RTL kerning: https://docu.glyphsapp.com/#GSFont.kerningRTL
         kerningLTR = gsKerningToFontraKerning(
-            self.gsFont, self.kerningGroups, "kerning", "left", "right"
+            self.gsFont,
+            self.kerningGroups,
+            self.defaultMasterID,
+            "kerning",
+            "left",
+            "right",
         )
         kerningAttr = (
             "vertKerning" if self.gsFont.format_version == 2 else "kerningVertical"
         )
         kerningVertical = gsKerningToFontraKerning(
-            self.gsFont, self.kerningGroups, kerningAttr, "top", "bottom"
+            self.gsFont,
+            self.kerningGroups,
+            self.defaultMasterID,
+            kerningAttr,
+            "top",
+            "bottom",
         )
 
         kerning = {}
@@ -211,9 +229,7 @@ class GlyphsBackend:
         if glyphName not in self.glyphNameToIndex:
             return None
 
-        self._ensureGlyphIsParsed(glyphName)
-
-        gsGlyph = self.gsFont.glyphs[glyphName]
+        gsGlyph = self._ensureGlyphIsParsed(glyphName)
 
         customData = {}
         if gsGlyph.color is not None:
@@ -224,24 +240,28 @@ class GlyphsBackend:
         sources = []
         layers = {}
 
-        seenMasterIDs: dict[str, None] = {}
+        # Group the layers by master, in order of each master's first appearance,
+        # while keeping the original layer order within each group
+        masterOrder: dict[str, int] = {}
         gsLayers = []
         for i, gsLayer in enumerate(gsGlyph.layers):
-            gsLayers.append((i, gsLayer))
             assert gsLayer.associatedMasterId
-            # We use a dict as a set, because we need the insertion order
-            seenMasterIDs[gsLayer.associatedMasterId] = None
+            masterIndex = masterOrder.setdefault(
+                gsLayer.associatedMasterId, len(masterOrder)
+            )
+            gsLayers.append((masterIndex, i, gsLayer))
+        gsLayers.sort(key=lambda item: item[:2])
 
-        masterOrder = {masterID: i for i, masterID in enumerate(seenMasterIDs)}
-        gsLayers = sorted(
-            gsLayers, key=lambda i_gsLayer: masterOrder[i_gsLayer[1].associatedMasterId]
-        )
+        locationByMasterID = self.locationByMasterID
+        masterNameByID = self.masterNameByID
+        localAxisNameMapping = self.localAxisNameMapping
 
-        seenLocations = []
-        for i, gsLayer in gsLayers:
+        seenLocations: set[tuple] = set()
+        for _, i, gsLayer in gsLayers:
+            masterID = gsLayer.associatedMasterId
             braceLocation = self._getBraceLayerLocation(gsLayer)
             smartLocation = self._getSmartLocation(gsLayer, localAxesByName)
-            masterName = self.gsFont.masters[gsLayer.associatedMasterId].name
+            masterName = masterNameByID[masterID]
             if braceLocation or smartLocation:
                 sourceName = f"{masterName} / {gsLayer.name}"
             else:
@@ -249,15 +269,16 @@ class GlyphsBackend:
             layerName = f"{sourceName} (layer #{i})"
 
             location = {
-                **self.locationByMasterID[gsLayer.associatedMasterId],
+                **locationByMasterID[masterID],
                 **braceLocation,
                 **smartLocation,
             }
 
-            if location in seenLocations:
+            locationKey = tuple(sorted(location.items()))
+            if locationKey in seenLocations:
                 inactive = True
             else:
-                seenLocations.append(location)
+                seenLocations.add(locationKey)
                 inactive = False
 
             sources.append(
@@ -268,7 +289,7 @@ class GlyphsBackend:
                     inactive=inactive,
                 )
             )
-            layers[layerName] = gsLayerToFontraLayer(gsLayer, self.axisNames)
+            layers[layerName] = gsLayerToFontraLayer(gsLayer, localAxisNameMapping)
 
         fixSourceLocations(sources, set(smartLocation))
 
@@ -281,30 +302,40 @@ class GlyphsBackend:
         )
         return glyph
 
-    def _ensureGlyphIsParsed(self, glyphName: str) -> None:
-        if glyphName in self.parsedGlyphNames:
-            return
+    def _ensureGlyphIsParsed(self, glyphName: str) -> glyphsLib.classes.GSGlyph:
+        gsGlyph = self.parsedGlyphs.get(glyphName)
+        if gsGlyph is not None:
+            return gsGlyph
 
-        glyphIndex = self.glyphNameToIndex[glyphName]
-        rawGlyphData = self.rawGlyphsData[glyphIndex]
-        self.rawGlyphsData[glyphIndex] = None
-        self.parsedGlyphNames.add(glyphName)
+        # Parse the glyph and, transitively, all its component dependencies,
+        # using a worklist rather than recursion to handle deep nesting
+        glyphNamesToParse = [glyphName]
 
-        gsGlyph = glyphsLib.classes.GSGlyph()
-        p = glyphsLib.parser.Parser(
-            current_type=gsGlyph.__class__, format_version=self.gsFont.format_version
-        )
-        p.parse_into_object(gsGlyph, rawGlyphData)
-        self.gsFont.glyphs[glyphIndex] = gsGlyph
+        while glyphNamesToParse:
+            nameToParse = glyphNamesToParse.pop()
+            if nameToParse in self.parsedGlyphs:
+                continue
 
-        # Load all component dependencies
-        componentNames = set()
-        for layer in gsGlyph.layers:
-            for component in layer.components:
-                componentNames.add(component.name)
+            glyphIndex = self.glyphNameToIndex[nameToParse]
+            rawGlyphData = self.rawGlyphsData[glyphIndex]
+            self.rawGlyphsData[glyphIndex] = None
 
-        for compoName in sorted(componentNames):
-            self._ensureGlyphIsParsed(compoName)
+            gsGlyph = glyphsLib.classes.GSGlyph()
+            p = glyphsLib.parser.Parser(
+                current_type=gsGlyph.__class__,
+                format_version=self.gsFont.format_version,
+            )
+            p.parse_into_object(gsGlyph, rawGlyphData)
+            self.gsFont.glyphs[glyphIndex] = gsGlyph
+            self.parsedGlyphs[nameToParse] = gsGlyph
+
+            # Queue all component dependencies
+            for layer in gsGlyph.layers:
+                glyphNamesToParse.extend(
+                    component.name for component in layer.components
+                )
+
+        return self.parsedGlyphs[glyphName]
 
     def _getBraceLayerLocation(self, gsLayer):
         if not gsLayer._is_brace_layer():
@@ -316,19 +347,17 @@ class GlyphsBackend:
         )
 
     def _getSmartLocation(self, gsLayer, localAxesByName):
-        location = {
-            name: (
-                localAxesByName[name].minValue
-                if poleValue == Pole.MIN
-                else localAxesByName[name].maxValue
-            )
-            for name, poleValue in gsLayer.smartComponentPoleMapping.items()
-        }
-        return {
-            disambiguateLocalAxisName(name, self.axisNames): value
-            for name, value in location.items()
-            if value != localAxesByName[name].defaultValue
-        }
+        if not localAxesByName:
+            # Not a smart component glyph
+            return {}
+
+        location = {}
+        for name, poleValue in gsLayer.smartComponentPoleMapping.items():
+            localAxis = localAxesByName[name]
+            value = localAxis.minValue if poleValue == Pole.MIN else localAxis.maxValue
+            if value != localAxis.defaultValue:
+                location[self.localAxisNameMapping.get(name, name)] = value
+        return location
 
     async def aclose(self) -> None:
         pass
@@ -355,7 +384,7 @@ class GlyphsPackageBackend(GlyphsBackend):
 
         rawGlyphsData = []
         for glyphfile in glyphsPath.glob("*.glyph"):
-            with open(glyphfile, "r") as fp:
+            with open(glyphfile, "r", encoding="utf-8") as fp:
                 glyphData = openstep_plist.load(fp, use_numbers=True)
             rawGlyphsData.append(glyphData)
 
@@ -374,49 +403,63 @@ class GlyphsPackageBackend(GlyphsBackend):
 
 def _readGlyphMapAndKerningGroups(
     rawGlyphsData: list, formatVersion: int
-) -> tuple[dict[str, list[int]], dict[str, tuple[str, str]]]:
+) -> tuple[dict[str, list[int]], dict[str, dict[str, list[str]]]]:
     glyphMap = {}
-    kerningGroups: dict = defaultdict(lambda: defaultdict(list))
 
-    sideAttrs = GS_FORMAT_2_KERN_SIDES if formatVersion == 2 else GS_FORMAT_3_KERN_SIDES
+    if formatVersion == 2:
+        sideAttrs = GS_FORMAT_2_KERN_SIDES
+        parseCodePoints = _parseCodePointsFormat2
+    else:
+        sideAttrs = GS_FORMAT_3_KERN_SIDES
+        parseCodePoints = _parseCodePointsFormat3
+
+    kerningGroups: dict[str, dict[str, list[str]]] = {
+        pairSide: {} for pairSide, _ in sideAttrs
+    }
+    sideGroupInfo = [
+        (glyphSideAttr, FONTRA_KERN_GROUP_PREFIXES[pairSide], kerningGroups[pairSide])
+        for pairSide, glyphSideAttr in sideAttrs
+    ]
 
     for glyphData in rawGlyphsData:
         glyphName = glyphData["glyphname"]
 
         # extract code points
         codePoints = glyphData.get("unicode")
-        if codePoints is None:
-            codePoints = []
-        elif formatVersion == 2:
-            if isinstance(codePoints, str):
-                codePoints = [int(codePoint, 16) for codePoint in codePoints.split(",")]
-            else:
-                assert isinstance(codePoints, int)
-                # The plist parser turned it into an int, but it was a hex string
-                codePoints = [int(str(codePoints), 16)]
-        elif isinstance(codePoints, int):
-            codePoints = [codePoints]
-        else:
-            assert all(isinstance(codePoint, int) for codePoint in codePoints)
-        glyphMap[glyphName] = codePoints
+        glyphMap[glyphName] = [] if codePoints is None else parseCodePoints(codePoints)
 
         # extract kern groups
-        for pairSide, glyphSideAttr in sideAttrs:
+        for glyphSideAttr, groupPrefix, groups in sideGroupInfo:
             groupName = glyphData.get(glyphSideAttr)
             if groupName is not None:
-                kerningGroups[pairSide][
-                    FONTRA_KERN_GROUP_PREFIXES[pairSide] + groupName
-                ].append(glyphName)
+                groups.setdefault(groupPrefix + groupName, []).append(glyphName)
 
     return glyphMap, kerningGroups
 
 
-def gsLayerToFontraLayer(gsLayer, globalAxisNames):
+def _parseCodePointsFormat2(codePoints) -> list[int]:
+    if isinstance(codePoints, str):
+        if "," not in codePoints:
+            return [int(codePoints, 16)]
+        return [int(codePoint, 16) for codePoint in codePoints.split(",")]
+    assert isinstance(codePoints, int)
+    # The plist parser turned it into an int, but it was a hex string
+    return [int(str(codePoints), 16)]
+
+
+def _parseCodePointsFormat3(codePoints) -> list[int]:
+    if isinstance(codePoints, int):
+        return [codePoints]
+    assert all(isinstance(codePoint, int) for codePoint in codePoints)
+    return codePoints
+
+
+def gsLayerToFontraLayer(gsLayer, localAxisNameMapping):
     pen = PackedPathPointPen()
     gsLayer.drawPoints(pen)
 
     components = [
-        gsComponentToFontraComponent(gsComponent, gsLayer, globalAxisNames)
+        gsComponentToFontraComponent(gsComponent, gsLayer, localAxisNameMapping)
         for gsComponent in gsLayer.components
     ]
 
@@ -432,20 +475,28 @@ def gsLayerToFontraLayer(gsLayer, globalAxisNames):
     )
 
 
-def gsComponentToFontraComponent(gsComponent, gsLayer, globalAxisNames):
+def gsComponentToFontraComponent(gsComponent, gsLayer, localAxisNameMapping):
+    smartComponentValues = gsComponent.smartComponentValues
+    location = (
+        {
+            localAxisNameMapping.get(name, name): value
+            for name, value in smartComponentValues.items()
+        }
+        if smartComponentValues
+        else {}
+    )
     component = Component(
         name=gsComponent.name,
         transformation=DecomposedTransform.fromTransform(gsComponent.transform),
-        location={
-            disambiguateLocalAxisName(name, globalAxisNames): value
-            for name, value in gsComponent.smartComponentValues.items()
-        },
+        location=location,
     )
     return component
 
 
-def disambiguateLocalAxisName(axisName, globalAxisNames):
-    return f"{axisName} (local)" if axisName in globalAxisNames else axisName
+def makeLocalAxisNameMapping(globalAxisNames):
+    # Local axis names that clash with a global axis name get disambiguated,
+    # all other local axis names map to themselves
+    return {axisName: f"{axisName} (local)" for axisName in globalAxisNames}
 
 
 def gsAnchorToFontraAnchor(gsAnchor):
@@ -487,6 +538,9 @@ def gsAxesToDesignSpaceAxes(gsFont):
 
 
 def gsLocalAxesToFontraLocalAxes(gsGlyph):
+    if not gsGlyph.smartComponentAxes:
+        return []
+
     basePoleMapping = gsGlyph.layers[0].smartComponentPoleMapping
     return [
         GlyphAxis(
@@ -507,27 +561,24 @@ def fixSourceLocations(sources, smartAxisNames):
     # If a set of sources is equally controlled by a font axis and a glyph axis
     # (smart axis), then the font axis should be ignored. This makes our
     # varLib-based variation model behave like Glyphs.
-    sets = defaultdict(set)
+    # Source indices are appended in increasing order, so each list is sorted
+    sourceIndicesByLocItem: dict[tuple[str, Any], list[int]] = {}
     for i, source in enumerate(sources):
         for locItem in source.location.items():
-            sets[locItem].add(i)
-
-    reverseSets = defaultdict(set)
-    for locItem, sourceIndices in sets.items():
-        reverseSets[tuple(sorted(sourceIndices))].add(locItem)
+            sourceIndicesByLocItem.setdefault(locItem, []).append(i)
 
-    matches = [locItems for locItems in reverseSets.values() if len(locItems) > 1]
+    locItemsBySourceIndices: dict[tuple[int, ...], list[tuple[str, Any]]] = {}
+    for locItem, sourceIndices in sourceIndicesByLocItem.items():
+        locItemsBySourceIndices.setdefault(tuple(sourceIndices), []).append(locItem)
 
-    locItemsToDelete = []
-    for locItems in matches:
+    for sourceIndices, locItems in locItemsBySourceIndices.items():
+        if len(locItems) < 2:
+            continue
         for axis, value in locItems:
             if axis not in smartAxisNames:
-                locItemsToDelete.append((axis, value))
-
-    for axis, value in locItemsToDelete:
-        for source in sources:
-            if source.location.get(axis) == value:
-                del source.location[axis]
+                # These are exactly the sources that have this location item
+                for i in sourceIndices:
+                    del sources[i].location[axis]
 
 
 def translateGroupName(name, oldPrefix, newPrefix):
@@ -535,22 +586,22 @@ def translateGroupName(name, oldPrefix, newPrefix):
 
 
 def gsKerningToFontraKerning(
-    gsFont, groupsBySide, kerningAttr, side1, side2
+    gsFont, groupsBySide, defaultMasterID, kerningAttr, side1, side2
 ) -> Kerning:
     gsPrefix1 = GS_KERN_GROUP_PREFIXES[side1]
     gsPrefix2 = GS_KERN_GROUP_PREFIXES[side2]
     fontraPrefix1 = FONTRA_KERN_GROUP_PREFIXES[side1]
     fontraPrefix2 = FONTRA_KERN_GROUP_PREFIXES[side2]
 
-    groups = dict(groupsBySide[side1] | groupsBySide[side2])
+    groups = groupsBySide[side1] | groupsBySide[side2]
 
     sourceIdentifiers = []
-    valueDicts: dict[str, dict[str, dict]] = defaultdict(lambda: defaultdict(dict))
+    kernDicts = []
 
-    defaultMasterID = get_regular_master(gsFont).id
+    kerningByMasterID = getattr(gsFont, kerningAttr)
 
     for gsMaster in gsFont.masters:
-        kernDict = getattr(gsFont, kerningAttr).get(gsMaster.id, {})
+        kernDict = kerningByMasterID.get(gsMaster.id, {})
         if not kernDict and gsMaster.id != defaultMasterID:
             # Even if the default master does not contain kerning, it makes life
             # easier down the road if we include this empty kerning, lest we run
@@ -558,21 +609,37 @@ def gsKerningToFontraKerning(
             continue
 
         sourceIdentifiers.append(gsMaster.id)
+        kernDicts.append(kernDict)
+
+    numSources = len(sourceIdentifiers)
+    values: dict[str, dict[str, list]] = {}
 
+    # The same names recur across rows and masters: translate each only once
+    translatedNames1: dict[str, str] = {}
+    translatedNames2: dict[str, str] = {}
+
+    for sourceIndex, kernDict in enumerate(kernDicts):
         for name1, name2Dict in kernDict.items():
-            name1 = translateGroupName(name1, gsPrefix1, fontraPrefix1)
+            if not name2Dict:
+                continue
+
+            fontraName1 = translatedNames1.get(name1)
+            if fontraName1 is None:
+                fontraName1 = translateGroupName(name1, gsPrefix1, fontraPrefix1)
+                translatedNames1[name1] = fontraName1
+
+            rowValues = values.setdefault(fontraName1, {})
 
             for name2, value in name2Dict.items():
-                name2 = translateGroupName(name2, gsPrefix2, fontraPrefix2)
-                valueDicts[name1][name2][gsMaster.id] = value
+                fontraName2 = translatedNames2.get(name2)
+                if fontraName2 is None:
+                    fontraName2 = translateGroupName(name2, gsPrefix2, fontraPrefix2)
+                    translatedNames2[name2] = fontraName2
 
-    values = {
-        left: {
-            right: [valueDict.get(key) for key in sourceIdentifiers]
-            for right, valueDict in rightDict.items()
-        }
-        for left, rightDict in valueDicts.items()
-    }
+                pairValues = rowValues.get(fontraName2)
+                if pairValues is None:
+                    pairValues = rowValues[fontraName2] = [None] * numSources
+                pairValues[sourceIndex] = value
 
     return Kerning(groups=groups, sourceIdentifiers=sourceIdentifiers, values=values)
 
@@ -595,34 +662,27 @@ def gsMastersToFontraFontSources(gsFont, locationByMasterID):
     return sources
 
 
-def gsToFontraZone(gsVerticalMetricsValue, gsAlignmentZones):
+def gsToFontraZones(gsAlignmentZones):
+    # Map zone positions to zone sizes; the first zone at a position wins
+    zones = {}
     for gsZone in gsAlignmentZones:
-        if gsZone.position == gsVerticalMetricsValue:
-            return gsZone.size
-    return 0
+        zones.setdefault(gsZone.position, gsZone.size)
+    return zones
 
 
 def gsVerticalMetricsToFontraLineMetricsHorizontal(gsFont, gsMaster):
+    zones = gsToFontraZones(gsMaster.alignmentZones)
+    ascender = gsMaster.ascender
+    capHeight = gsMaster.capHeight
+    xHeight = gsMaster.xHeight
+    descender = gsMaster.descender
+
     lineMetricsHorizontal = {
-        "ascender": LineMetric(
-            value=gsMaster.ascender,
-            zone=gsToFontraZone(gsMaster.ascender, gsMaster.alignmentZones),
-        ),
-        "capHeight": LineMetric(
-            value=gsMaster.capHeight,
-            zone=gsToFontraZone(gsMaster.capHeight, gsMaster.alignmentZones),
-        ),
-        "xHeight": LineMetric(
-            value=gsMaster.xHeight,
-            zone=gsToFontraZone(gsMaster.xHeight, gsMaster.alignmentZones),
-        ),
-        "baseline": LineMetric(
-            value=0, zone=gsToFontraZone(0, gsMaster.alignmentZones)
-        ),
-        "descender": LineMetric(
-            value=gsMaster.descender,
-            zone=gsToFontraZone(gsMaster.descender, gsMaster.alignmentZones),
-        ),
+        "ascender": LineMetric(value=ascender, zone=zones.get(ascender, 0)),
+        "capHeight": LineMetric(value=capHeight, zone=zones.get(capHeight, 0)),
+        "xHeight": LineMetric(value=xHeight, zone=zones.get(xHeight, 0)),
+        "baseline": LineMetric(value=0, zone=zones.get(0, 0)),
+        "descender": LineMetric(value=descender, zone=zones.get(descender, 0)),
     }
 
     # TODO: custom metrics https://docu.glyphsapp.com/#GSFontMaster.metrics
@@ -636,7 +696,7 @@ def gsVerticalMetricsToFontraLineMetricsHorizontal(gsFont, gsMaster):
     #         print('overshoot: ', gsMetricValue.overshoot)
     #         lineMetricsHorizontal[gsMetric.name] = LineMetric(
     #             value=gsMetricValue.position,
-    #             zone=gsToFontraZone(gsMetricValue.overshoot, gsMaster.alignmentZones)
+    #             zone=zones.get(gsMetricValue.overshoot, 0)
     #         )
 
     return lineMetricsHorizontal